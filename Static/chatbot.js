@@ -0,0 +1,68 @@
+// Send messages to the JSON endpoint and append only the new turn;
+// the chatbot.html forms still work as a full-page fallback without JavaScript.
+const chatBox = document.getElementById('chatBox');
+const chatButtons = document.getElementById('chatButtons');
+const chatForm = document.getElementById('chatForm');
+
+function appendMessage(sender, text) {
+    const div = document.createElement('div');
+    div.className = sender + '-message';
+    div.textContent = text;
+    chatBox.appendChild(div);
+    chatBox.scrollTop = chatBox.scrollHeight;
+}
+
+function renderButtons(buttons) {
+    chatButtons.replaceChildren();
+    buttons.forEach(function (label) {
+        const button = document.createElement('button');
+        button.type = 'button';
+        button.textContent = label;
+        if (label === 'View Tickets in Profile') {
+            button.className = 'profile-button';
+        }
+        button.addEventListener('click', function () { sendMessage(label); });
+        chatButtons.appendChild(button);
+    });
+}
+
+function sendMessage(message) {
+    appendMessage('user', message);
+    renderButtons([]);
+    fetch(chatForm.dataset.apiUrl, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({message: message})
+    })
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+            if (data.error) {
+                window.location = chatForm.dataset.loginUrl;
+            } else if (data.redirect) {
+                window.location = data.redirect;
+            } else {
+                appendMessage('bot', data.reply);
+                renderButtons(data.buttons);
+            }
+        })
+        .catch(function () {
+            appendMessage('bot', 'Connection problem. Please try again.');
+        });
+}
+
+chatForm.addEventListener('submit', function (event) {
+    event.preventDefault();
+    const input = chatForm.elements.message;
+    const message = input.value.trim();
+    if (message) {
+        input.value = '';
+        sendMessage(message);
+    }
+});
+
+chatButtons.addEventListener('click', function (event) {
+    if (event.target.form) {
+        event.preventDefault();
+        sendMessage(event.target.value);
+    }
+});
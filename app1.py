@@ -1,18 +1,85 @@
 from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash, send_file
-import uuid
+from flask.cli import load_dotenv
+from flask.helpers import get_debug_flag
+import hashlib
+import hmac
+import threading
+import time
 from datetime import datetime
 import qrcode
 from io import BytesIO
+from urllib.request import pathname2url
 import sqlite3
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import generate_password_hash, check_password_hash, safe_join
+from werkzeug.serving import is_running_from_reloader
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 import os
+import gzip
+import json
+import smtplib
+from email.message import EmailMessage
+import click
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
-app = Flask(__name__)
+
+app = Flask(__name__, static_folder='Static', static_url_path='/static')
 app.secret_key = 'your-secret-key-here'
 
+DATABASE = 'event_management.db'
+
+# Listing endpoints read from a snapshot so they never wait on purchase writes.
+# With READ_REPLICA unset they read WAL snapshots of DATABASE; otherwise they read
+# a copy at that path that a background thread refreshes through the backup API
+# every READ_REPLICA_MAX_STALENESS seconds.
+READ_REPLICA = None
+READ_REPLICA_MAX_STALENESS = 5
+
+# Ticket numbers are encoded from integer sequence values using Crockford base32.
+# The check characters use their own key, kept apart from app.secret_key so that
+# rotating the session key does not invalidate issued tickets; never change it.
+TICKET_HMAC_KEY = 'your-ticket-key-here'
+TICKET_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+TICKET_CODE_WIDTH = 6
+TICKET_BLOCK_SIZE = 100
+
+# Bumped whenever migrate_db learns a new step
+SCHEMA_VERSION = 1
+
+# Profile page settings
+PROFILE_PAGE_SIZE = 20
+PROFILE_CACHE_TTL = 60  # seconds
+PROFILE_CACHE_MAX_PAGES = 10  # ticket pages kept per user
+
+# Column lists shared by the hot tables and their archive copies
+EVENT_COLUMNS = 'id, name, type, date, location, capacity, ticket_price, creator_id'
+TICKET_COLUMNS = 'id, event_id, user_id, ticket_seq, legacy_number, purchase_date'
+ARCHIVE_BATCH_SIZE = 100  # events moved per transaction
+
+# Notification outbox: confirmations are queued with the purchase and sent in the background
+NOTIFICATION_FILE = 'notifications.log'  # local stand-in sink, one JSON message per line
+NOTIFICATION_SMTP_HOST = None  # e.g. 'localhost' to use an SMTP debugging server instead
+NOTIFICATION_SMTP_PORT = 1025
+NOTIFICATION_SENDER = 'tickets@example.com'
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_POLL_INTERVAL = 2  # seconds between polls when the outbox is empty
+OUTBOX_LEASE = 60  # seconds a claimed batch stays hidden from other dispatchers
+OUTBOX_RETRY_BASE = 5  # seconds, doubled after every failed attempt
+OUTBOX_RETRY_MAX = 3600
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETENTION = 7 * 24 * 60 * 60  # seconds sent notifications are kept before purging
+OUTBOX_PURGE_INTERVAL = 60 * 60  # seconds between purges in the dispatcher loop
+OUTBOX_PURGE_BATCH = 500  # rows deleted per transaction
+
+# Static asset caching and response compression
+STATIC_MAX_AGE = 365 * 24 * 60 * 60  # fingerprinted assets never change
+COMPRESS_MIN_SIZE = 500  # bytes
+COMPRESS_MIMETYPES = {'text/html', 'text/css', 'application/json', 'text/javascript'}
+
 # Event venues and their details
 VENUES = {
     'conference': {
@@ -33,9 +100,12 @@ VENUES = {
 }
 
 def init_db():
-    conn = sqlite3.connect('event_management.db')
+    conn = sqlite3.connect(DATABASE)
     cursor = conn.cursor()
     
+    # WAL lets readers keep their snapshot while a purchase holds the write lock
+    cursor.execute('PRAGMA journal_mode=WAL')
+    
     # Create users table
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS users (
@@ -67,21 +137,171 @@ def init_db():
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         event_id INTEGER,
         user_id INTEGER,
-        ticket_number TEXT UNIQUE NOT NULL,
+        ticket_seq INTEGER UNIQUE NOT NULL,
+        legacy_number TEXT,
         purchase_date TEXT NOT NULL,
         FOREIGN KEY (event_id) REFERENCES events (id),
         FOREIGN KEY (user_id) REFERENCES users (id)
     )
     ''')
     
+    # Create sequences table used to reserve blocks of ticket numbers
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS sequences (
+        name TEXT PRIMARY KEY,
+        next_value INTEGER NOT NULL
+    )
+    ''')
+    
+    # Create outbox table for notifications written alongside purchases
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        recipient TEXT NOT NULL,
+        subject TEXT NOT NULL,
+        body TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL DEFAULT 0,
+        last_error TEXT
+    )
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_outbox_pending
+    ON outbox (status, next_attempt_at)
+    ''')
+    
+    # Create archive tables for past events and their tickets
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS events_archive (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        type TEXT NOT NULL,
+        date TEXT NOT NULL,
+        location TEXT NOT NULL,
+        capacity INTEGER NOT NULL,
+        ticket_price REAL NOT NULL,
+        creator_id INTEGER,
+        FOREIGN KEY (creator_id) REFERENCES users (id)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS tickets_archive (
+        id INTEGER PRIMARY KEY,
+        event_id INTEGER,
+        user_id INTEGER,
+        ticket_seq INTEGER UNIQUE NOT NULL,
+        legacy_number TEXT,
+        purchase_date TEXT NOT NULL,
+        FOREIGN KEY (event_id) REFERENCES events_archive (id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+    conn.commit()
+    
+    # Bring tables created by older versions up to date before indexing them
+    migrate_db(conn)
+    
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_tickets_user
+    ON tickets (user_id, purchase_date)
+    ''')
+    cursor.execute('''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_tickets_legacy
+    ON tickets (legacy_number) WHERE legacy_number IS NOT NULL
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_tickets_archive_user
+    ON tickets_archive (user_id, purchase_date)
+    ''')
+    cursor.execute('''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_tickets_archive_legacy
+    ON tickets_archive (legacy_number) WHERE legacy_number IS NOT NULL
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_events_date
+    ON events (date)
+    ''')
+    
+    # History views read the hot tables and the archive together;
+    # they are recreated so their column lists follow the tables
+    cursor.execute('DROP VIEW IF EXISTS all_events')
+    cursor.execute('DROP VIEW IF EXISTS all_tickets')
+    cursor.execute(f'''
+    CREATE VIEW all_events AS
+    SELECT {EVENT_COLUMNS} FROM events
+    UNION ALL
+    SELECT {EVENT_COLUMNS} FROM events_archive
+    ''')
+    cursor.execute(f'''
+    CREATE VIEW all_tickets AS
+    SELECT {TICKET_COLUMNS} FROM tickets
+    UNION ALL
+    SELECT {TICKET_COLUMNS} FROM tickets_archive
+    ''')
+    
     conn.commit()
     conn.close()
     
     # Create sample events
     create_sample_events()
 
+def migrate_db(conn):
+    """Upgrade a database created by an older version of the app to SCHEMA_VERSION."""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    
+    conn.execute('BEGIN')
+    try:
+        if version < 1:
+            # Version 1: tickets are keyed by an allocated integer ticket_seq. Numbers
+            # issued before that are kept in legacy_number so printed tickets stay valid.
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(tickets)')]
+            if 'ticket_number' in columns:
+                conn.execute('ALTER TABLE tickets RENAME TO tickets_legacy')
+                conn.execute('''
+                CREATE TABLE tickets (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    event_id INTEGER,
+                    user_id INTEGER,
+                    ticket_seq INTEGER UNIQUE NOT NULL,
+                    legacy_number TEXT,
+                    purchase_date TEXT NOT NULL,
+                    FOREIGN KEY (event_id) REFERENCES events (id),
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+                ''')
+                conn.execute('''
+                INSERT INTO tickets (id, event_id, user_id, ticket_seq, legacy_number, purchase_date)
+                SELECT id, event_id, user_id, id, ticket_number, purchase_date
+                FROM tickets_legacy
+                ''')
+                conn.execute('DROP TABLE tickets_legacy')
+            for table in ('tickets', 'tickets_archive'):
+                columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+                if 'legacy_number' not in columns:
+                    conn.execute(f'ALTER TABLE {table} ADD COLUMN legacy_number TEXT')
+            
+            # New allocations must start above every backfilled sequence value
+            conn.execute("INSERT OR IGNORE INTO sequences (name, next_value) VALUES ('ticket', 1)")
+            conn.execute('''
+            UPDATE sequences
+            SET next_value = MAX(next_value,
+                                 (SELECT COALESCE(MAX(ticket_seq), 0) + 1 FROM tickets),
+                                 (SELECT COALESCE(MAX(ticket_seq), 0) + 1 FROM tickets_archive))
+            WHERE name = 'ticket'
+            ''')
+        
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
 def create_sample_events():
-    conn = sqlite3.connect('event_management.db')
+    conn = sqlite3.connect(DATABASE)
     cursor = conn.cursor()
     
     # Sample events data
@@ -94,8 +314,8 @@ def create_sample_events():
         ('Science Expo', 'exhibition', '2025-01-05', 'Chennai Convention Centre', 600, 500, 1)
     ]
     
-    # Check if events exist
-    cursor.execute('SELECT COUNT(*) FROM events')
+    # Check if events exist, including archived ones
+    cursor.execute('SELECT COUNT(*) FROM all_events')
     if cursor.fetchone()[0] == 0:
         # Create default admin user if not exists
         cursor.execute('SELECT id FROM users WHERE username = ?', ('admin',))
@@ -118,6 +338,583 @@ def create_sample_events():
         conn.commit()
     conn.close()
 
+def archive_past_events(before=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move events dated before `before` (default: today) and their tickets to the archive.
+
+    Each batch of events moves together with its tickets in one transaction,
+    so readers never see an event split between the hot and archive tables.
+    Returns the number of events and tickets archived.
+    """
+    if before is None:
+        before = datetime.now().strftime('%Y-%m-%d')
+    
+    conn = sqlite3.connect(DATABASE)
+    cursor = conn.cursor()
+    archived_events = 0
+    archived_tickets = 0
+    try:
+        while True:
+            cursor.execute('SELECT id FROM events WHERE date < ? ORDER BY id LIMIT ?',
+                           (before, batch_size))
+            event_ids = [row[0] for row in cursor.fetchall()]
+            if not event_ids:
+                break
+            
+            placeholders = ', '.join('?' * len(event_ids))
+            cursor.execute(f'''
+                INSERT INTO events_archive ({EVENT_COLUMNS})
+                SELECT {EVENT_COLUMNS} FROM events WHERE id IN ({placeholders})
+            ''', event_ids)
+            cursor.execute(f'''
+                INSERT INTO tickets_archive ({TICKET_COLUMNS})
+                SELECT {TICKET_COLUMNS} FROM tickets WHERE event_id IN ({placeholders})
+            ''', event_ids)
+            archived_tickets += cursor.rowcount
+            cursor.execute(f'DELETE FROM tickets WHERE event_id IN ({placeholders})', event_ids)
+            cursor.execute(f'DELETE FROM events WHERE id IN ({placeholders})', event_ids)
+            conn.commit()
+            archived_events += len(event_ids)
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    
+    return archived_events, archived_tickets
+
+@app.cli.command('archive-events')
+@click.option('--before', default=None, help='Archive events dated before this day (YYYY-MM-DD). Defaults to today.')
+@click.option('--batch-size', default=ARCHIVE_BATCH_SIZE, show_default=True, help='Events moved per transaction.')
+def archive_events_command(before, batch_size):
+    """Move past events and their tickets into the archive tables."""
+    archived_events, archived_tickets = archive_past_events(before, batch_size)
+    click.echo(f'Archived {archived_events} events and {archived_tickets} tickets.')
+
+class ReadReplica:
+    """A read-only copy of the database refreshed through SQLite's backup API.
+
+    A background thread rebuilds the copy every READ_REPLICA_MAX_STALENESS
+    seconds, so no request pays for the backup once the first copy exists.
+    Each copy is written to a temporary file and swapped in with os.replace;
+    readers holding the previous copy keep a consistent view and the file a
+    connection opens is never modified afterwards.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._path = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self, path):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            source = sqlite3.connect(DATABASE)
+            try:
+                copy = sqlite3.connect(tmp_path)
+                try:
+                    source.backup(copy)
+                    copy.execute('PRAGMA journal_mode=DELETE')
+                finally:
+                    copy.close()
+            finally:
+                source.close()
+            try:
+                os.replace(tmp_path, path)
+            except OSError:
+                # The old copy is still open somewhere (Windows); serve it a little longer
+                if not os.path.exists(path):
+                    raise
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._path = path
+
+    def run(self):
+        while not self._stop.wait(READ_REPLICA_MAX_STALENESS):
+            try:
+                with self._lock:
+                    self.refresh(self._path)
+            except (sqlite3.Error, OSError) as e:
+                app.logger.error(f"Read replica refresh failed: {str(e)}")
+
+    def start(self):
+        # Threads do not survive a fork, so a worker starts its own on first use
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name='read-replica', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def connect(self, path):
+        if self._path != path or not os.path.exists(path):
+            # Only the very first read (or a changed path) waits for a copy to exist
+            with self._lock:
+                if self._path != path or not os.path.exists(path):
+                    self.refresh(path)
+        self.start()
+        return sqlite3.connect(f'file:{pathname2url(os.path.abspath(path))}?immutable=1', uri=True)
+
+read_replica = ReadReplica()
+
+def get_read_connection():
+    """Open a connection for listing queries that never blocks on writers."""
+    if READ_REPLICA:
+        return read_replica.connect(READ_REPLICA)
+    return sqlite3.connect(f'file:{pathname2url(os.path.abspath(DATABASE))}?mode=ro', uri=True)
+
+class TicketAllocator:
+    """Hands out ticket sequence numbers from blocks reserved in the database.
+
+    Each process reserves a contiguous block of numbers in a short transaction
+    of its own, so bulk purchases need no per-ticket round trips or retries.
+    Numbers left over when a process exits are simply never used.
+    """
+
+    def __init__(self, name='ticket', block_size=TICKET_BLOCK_SIZE):
+        self.name = name
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._pid = os.getpid()
+        self._next = 0
+        self._end = 0
+
+    def _reserve(self, size):
+        conn = sqlite3.connect(DATABASE, isolation_level=None)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('INSERT OR IGNORE INTO sequences (name, next_value) VALUES (?, 1)',
+                         (self.name,))
+            start = conn.execute('SELECT next_value FROM sequences WHERE name = ?',
+                                 (self.name,)).fetchone()[0]
+            conn.execute('UPDATE sequences SET next_value = ? WHERE name = ?',
+                         (start + size, self.name))
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        self._next = start
+        self._end = start + size
+
+    def allocate(self, count):
+        with self._lock:
+            # A forked worker must not reuse the block reserved by its parent
+            if self._pid != os.getpid():
+                self.reset()
+            numbers = []
+            while len(numbers) < count:
+                if self._next >= self._end:
+                    self._reserve(max(self.block_size, count - len(numbers)))
+                take = min(self._end - self._next, count - len(numbers))
+                numbers.extend(range(self._next, self._next + take))
+                self._next += take
+            return numbers
+
+ticket_allocator = TicketAllocator()
+
+def _ticket_check(ticket_seq):
+    digest = hmac.new(TICKET_HMAC_KEY.encode(), str(ticket_seq).encode(), hashlib.sha256).digest()
+    return TICKET_ALPHABET[digest[0] % 32] + TICKET_ALPHABET[digest[1] % 32]
+
+@app.template_filter('ticket_number')
+def encode_ticket_number(ticket_seq):
+    body = ''
+    value = ticket_seq
+    while value:
+        value, remainder = divmod(value, 32)
+        body = TICKET_ALPHABET[remainder] + body
+    body = body.rjust(TICKET_CODE_WIDTH, '0')
+    return f"TKT-{body}-{_ticket_check(ticket_seq)}"
+
+def decode_ticket_number(ticket_number):
+    try:
+        prefix, body, check = ticket_number.strip().upper().split('-')
+    except ValueError:
+        return None
+    if prefix != 'TKT' or not body or any(c not in TICKET_ALPHABET for c in body):
+        return None
+    if len(check) != 2 or any(c not in TICKET_ALPHABET for c in check):
+        return None
+    ticket_seq = 0
+    for c in body:
+        ticket_seq = ticket_seq * 32 + TICKET_ALPHABET.index(c)
+    if not hmac.compare_digest(check, _ticket_check(ticket_seq)):
+        return None
+    return ticket_seq
+
+def enqueue_notification(cursor, user_id, subject, body):
+    """Queue a notification for a user on the caller's cursor.
+
+    The row commits or rolls back with the caller's transaction, so a
+    confirmation exists exactly when the purchase or event it describes does.
+    """
+    cursor.execute('''
+        INSERT INTO outbox (recipient, subject, body, created_at)
+        SELECT email, ?, ?, ? FROM users WHERE id = ?
+    ''', (subject, body, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), user_id))
+
+class FileSink:
+    """Appends each notification as a JSON line to a local file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send_batch(self, messages):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for message in messages:
+                f.write(json.dumps(message) + '\n')
+        return {}
+
+class SmtpSink:
+    """Sends notifications over one SMTP connection per batch."""
+
+    def __init__(self, host, port, sender):
+        self.host = host
+        self.port = port
+        self.sender = sender
+
+    def send_batch(self, messages):
+        failures = {}
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            for message in messages:
+                email = EmailMessage()
+                email['From'] = self.sender
+                email['To'] = message['recipient']
+                email['Subject'] = message['subject']
+                email.set_content(message['body'])
+                try:
+                    smtp.send_message(email)
+                except smtplib.SMTPException as e:
+                    failures[message['id']] = str(e)
+        return failures
+
+def default_notification_sink():
+    if NOTIFICATION_SMTP_HOST:
+        return SmtpSink(NOTIFICATION_SMTP_HOST, NOTIFICATION_SMTP_PORT, NOTIFICATION_SENDER)
+    return FileSink(NOTIFICATION_FILE)
+
+class OutboxDispatcher:
+    """Delivers queued notifications in batches, retrying failures with backoff.
+
+    A sink's send_batch(messages) returns {message_id: error} for the messages
+    it could not deliver; raising fails the whole batch.
+    """
+
+    def __init__(self, sink=None, batch_size=OUTBOX_BATCH_SIZE):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.metrics = {'sent': 0, 'retried': 0, 'failed': 0, 'lease_lost': 0,
+                        'purged': 0, 'batches': 0, 'send_seconds': 0.0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _claim_batch(self, now):
+        """Lease a batch of due rows; returns the rows and the lease they were claimed with."""
+        lease = now + OUTBOX_LEASE
+        conn = sqlite3.connect(DATABASE, isolation_level=None)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute('''
+                SELECT id, recipient, subject, body, attempts
+                FROM outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY id
+                LIMIT ?
+            ''', (now, self.batch_size)).fetchall()
+            conn.executemany('UPDATE outbox SET next_attempt_at = ? WHERE id = ?',
+                             [(lease, row[0]) for row in rows])
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        return rows, lease
+
+    def dispatch_batch(self):
+        """Send one batch of due notifications and return how many were delivered."""
+        return self._dispatch()[1]
+
+    def drain(self):
+        """Send batches until no notification is due; returns how many were delivered.
+
+        A batch that fails entirely still counts as work, so later due rows are
+        not left behind; failed rows are not due again until their backoff expires.
+        """
+        delivered = 0
+        while True:
+            claimed, sent = self._dispatch()
+            if not claimed:
+                return delivered
+            delivered += sent
+
+    def _dispatch(self):
+        """Claim and send one batch; returns (rows claimed, rows delivered)."""
+        now = time.time()
+        rows, lease = self._claim_batch(now)
+        if not rows:
+            return 0, 0
+        
+        messages = [{'id': row[0], 'recipient': row[1], 'subject': row[2], 'body': row[3]}
+                    for row in rows]
+        sink = self.sink or default_notification_sink()
+        start = time.perf_counter()
+        try:
+            failures = sink.send_batch(messages)
+        except Exception as e:
+            failures = {message['id']: str(e) for message in messages}
+        self.metrics['send_seconds'] += time.perf_counter() - start
+        self.metrics['batches'] += 1
+        
+        finished = time.time()
+        sent_ids = [(row[0], lease) for row in rows if row[0] not in failures]
+        retries = []
+        dead = []
+        for row in rows:
+            if row[0] not in failures:
+                continue
+            attempts = row[4] + 1
+            if attempts >= OUTBOX_MAX_ATTEMPTS:
+                dead.append((attempts, failures[row[0]], row[0], lease))
+            else:
+                delay = min(OUTBOX_RETRY_BASE * 2 ** (attempts - 1), OUTBOX_RETRY_MAX)
+                retries.append((attempts, finished + delay, failures[row[0]], row[0], lease))
+        
+        # Each update only applies while this dispatcher still holds the lease; if a
+        # slow batch outlived it, the rows belong to whichever dispatcher re-claimed them
+        conn = sqlite3.connect(DATABASE)
+        try:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE outbox SET status = 'sent', last_error = NULL
+                WHERE id = ? AND next_attempt_at = ?
+            ''', sent_ids)
+            sent = cursor.rowcount
+            cursor.executemany('''
+                UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ?
+                WHERE id = ? AND next_attempt_at = ?
+            ''', retries)
+            retried = cursor.rowcount
+            cursor.executemany('''
+                UPDATE outbox SET status = 'failed', attempts = ?, last_error = ?
+                WHERE id = ? AND next_attempt_at = ?
+            ''', dead)
+            failed = cursor.rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        
+        self.metrics['sent'] += sent
+        self.metrics['retried'] += retried
+        self.metrics['failed'] += failed
+        self.metrics['lease_lost'] += len(rows) - sent - retried - failed
+        return len(rows), sent
+
+    def purge(self, before=None, batch_size=OUTBOX_PURGE_BATCH):
+        """Delete sent notifications older than OUTBOX_RETENTION; returns how many.
+
+        A sent row keeps the lease it was delivered under in next_attempt_at,
+        so its age is read from there using the pending index.
+        """
+        if before is None:
+            before = time.time() - OUTBOX_RETENTION
+        conn = sqlite3.connect(DATABASE)
+        purged = 0
+        try:
+            while True:
+                cursor = conn.execute('''
+                    DELETE FROM outbox WHERE id IN (
+                        SELECT id FROM outbox
+                        WHERE status = 'sent' AND next_attempt_at < ?
+                        LIMIT ?
+                    )
+                ''', (before, batch_size))
+                conn.commit()
+                purged += cursor.rowcount
+                if cursor.rowcount < batch_size:
+                    break
+        finally:
+            conn.close()
+        self.metrics['purged'] += purged
+        return purged
+
+    def run(self, poll_interval=OUTBOX_POLL_INTERVAL):
+        next_purge = 0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() >= next_purge:
+                    next_purge = time.monotonic() + OUTBOX_PURGE_INTERVAL
+                    self.purge()
+                claimed = self._dispatch()[0]
+            except sqlite3.Error as e:
+                app.logger.error(f"Outbox dispatch failed: {str(e)}")
+                claimed = 0
+            # Keep draining while full batches come back; otherwise wait for more work
+            if claimed < self.batch_size:
+                self._stop.wait(poll_interval)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name='outbox-dispatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def throughput(self):
+        """Delivered notifications per second of time spent in the sink."""
+        if not self.metrics['send_seconds']:
+            return 0.0
+        return self.metrics['sent'] / self.metrics['send_seconds']
+
+outbox_dispatcher = OutboxDispatcher()
+outbox_warning_logged = False
+
+@app.before_request
+def warn_if_outbox_not_dispatched():
+    # Only `python app1.py` starts the dispatcher; under `flask run` or a WSGI
+    # server the outbox would otherwise never drain without any sign of it
+    global outbox_warning_logged
+    if not outbox_warning_logged and not outbox_dispatcher.running:
+        outbox_warning_logged = True
+        app.logger.warning("Notifications are not dispatched by this process; run "
+                           "'flask --app app1 dispatch-notifications' alongside the server.")
+
+@app.cli.command('dispatch-notifications')
+@click.option('--once', is_flag=True, help='Drain the due notifications and exit.')
+def dispatch_notifications_command(once):
+    """Deliver queued ticket and event notifications."""
+    if once:
+        outbox_dispatcher.drain()
+        outbox_dispatcher.purge()
+    else:
+        try:
+            outbox_dispatcher.run()
+        except KeyboardInterrupt:
+            pass
+    metrics = outbox_dispatcher.metrics
+    click.echo(f"Sent {metrics['sent']} in {metrics['batches']} batches, "
+               f"{metrics['retried']} retried, {metrics['failed']} failed, "
+               f"{metrics['purged']} purged ({outbox_dispatcher.throughput():.0f}/s).")
+
+# Static files are fingerprinted with a content hash so they can be cached forever
+static_hashes = {}
+compressed_static = {}
+
+def static_file_path(filename):
+    """Resolve a static filename to a regular file inside the static folder, or None."""
+    path = safe_join(app.static_folder, filename)
+    if path is None or not os.path.isfile(path):
+        return None
+    return os.path.normpath(path)
+
+def static_file_hash(filename):
+    path = static_file_path(filename)
+    if path is None:
+        return None
+    # Keyed by resolved path so differently spelled URLs share one entry
+    mtime = os.path.getmtime(path)
+    cached = static_hashes.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as f:
+            cached = (mtime, hashlib.sha256(f.read()).hexdigest()[:12])
+        static_hashes[path] = cached
+    return cached[1]
+
+@app.url_defaults
+def add_static_fingerprint(endpoint, values):
+    if endpoint == 'static' and 'filename' in values and 'v' not in values:
+        file_hash = static_file_hash(values['filename'])
+        if file_hash:
+            values['v'] = file_hash
+
+def choose_encoding(accept_encoding):
+    if brotli is not None and 'br' in accept_encoding:
+        return 'br'
+    if 'gzip' in accept_encoding:
+        return 'gzip'
+    return None
+
+def compress_body(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+@app.after_request
+def cache_and_compress(response):
+    version = request.args.get('v')
+    # Only files the static view actually served are hashed
+    fingerprinted = (request.endpoint == 'static' and response.status_code in (200, 304) and
+                     version is not None and
+                     version == static_file_hash(request.view_args['filename']))
+    if fingerprinted:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+    
+    if response.mimetype not in COMPRESS_MIMETYPES:
+        return response
+    # Every compressible response varies, including the identity copy a shared
+    # cache would otherwise hand to clients that do accept gzip
+    response.vary.add('Accept-Encoding')
+    
+    encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+    if (encoding is None or response.status_code != 200 or
+            'Content-Encoding' in response.headers):
+        return response
+    
+    if response.direct_passthrough:
+        # Static files are compressed once per fingerprint and encoding
+        if not fingerprinted:
+            return response
+        path = static_file_path(request.view_args['filename'])
+        key = (path, version, encoding)
+        body = compressed_static.get(key)
+        if body is None:
+            with open(path, 'rb') as f:
+                body = compress_body(f.read(), encoding)
+            compressed_static[key] = body
+        response.response.close()
+        response.direct_passthrough = False
+        response.headers.pop('Accept-Ranges', None)
+    elif response.is_streamed:
+        return response
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        body = compress_body(data, encoding)
+    
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    etag, _ = response.get_etag()
+    if etag:
+        # send_file checked If-None-Match against the identity ETag, so repeat
+        # the conditional check against the encoded one
+        response.set_etag(f"{etag}-{encoding}", weak=True)
+        response.make_conditional(request)
+    return response
+
 @app.route('/')
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -125,7 +922,7 @@ def login():
         username = request.form['username']
         password = request.form['password']
         
-        conn = sqlite3.connect('event_management.db')
+        conn = sqlite3.connect(DATABASE)
         cursor = conn.cursor()
         cursor.execute('SELECT id, password FROM users WHERE username = ?', (username,))
         user = cursor.fetchone()
@@ -160,7 +957,7 @@ def register():
             
         hashed_password = generate_password_hash(password)
         
-        conn = sqlite3.connect('event_management.db')
+        conn = sqlite3.connect(DATABASE)
         cursor = conn.cursor()
         
         try:
@@ -181,7 +978,7 @@ def home():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    conn = sqlite3.connect('event_management.db')
+    conn = get_read_connection()
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM events ORDER BY date ASC')
     events = cursor.fetchall()
@@ -189,41 +986,167 @@ def home():
     
     return render_template('home.html', events=events)
 
-@app.route('/profile')
-def profile():
-    if 'user_id' not in session:
-        return redirect(url_for('login'))
-    
-    conn = sqlite3.connect('event_management.db')
+# Per-user cache of profile data, invalidated on purchase or event creation.
+# Profiles read the primary rather than the read replica: a stale copy read
+# straight after an invalidation would be cached and hide the purchase.
+# Entries are kept in load order so expired ones can be evicted from the front.
+profile_cache = {}
+profile_cache_lock = threading.Lock()
+
+def invalidate_profile_cache(user_id):
+    with profile_cache_lock:
+        profile_cache.pop(user_id, None)
+
+def _profile_version(user_id):
+    """Cheap fingerprint of a user's profile data, shared by every worker process.
+
+    New purchases always become the user's newest hot ticket, so together with the
+    created-events count this changes whenever another process changes the profile.
+    """
+    conn = sqlite3.connect(DATABASE)
     cursor = conn.cursor()
+    cursor.execute('''
+        SELECT (SELECT id FROM tickets WHERE user_id = ?
+                ORDER BY purchase_date DESC, id DESC LIMIT 1),
+               (SELECT COUNT(*) FROM all_events WHERE creator_id = ?)
+    ''', (user_id, user_id))
+    version = cursor.fetchone()
+    conn.close()
+    return version
+
+def _cached_profile_entry(user_id):
+    version = _profile_version(user_id)
+    now = time.monotonic()
+    with profile_cache_lock:
+        while profile_cache:
+            oldest = next(iter(profile_cache))
+            if now - profile_cache[oldest]['loaded_at'] <= PROFILE_CACHE_TTL:
+                break
+            del profile_cache[oldest]
+        entry = profile_cache.get(user_id)
+        if entry is None or entry['version'] != version:
+            profile_cache.pop(user_id, None)
+            entry = {'loaded_at': now, 'version': version, 'summary': None, 'pages': {}}
+            profile_cache[user_id] = entry
+        return entry
+
+def _cache_profile_page(entry, page, tickets):
+    with profile_cache_lock:
+        pages = entry['pages']
+        pages[page] = tickets
+        while len(pages) > PROFILE_CACHE_MAX_PAGES:
+            del pages[next(iter(pages))]
+
+def get_profile_summary(user_id):
+    entry = _cached_profile_entry(user_id)
+    if entry['summary'] is not None:
+        return entry['summary']
     
-    # Get user's tickets with all necessary information
+    conn = sqlite3.connect(DATABASE)
+    cursor = conn.cursor()
+    # Tickets grouped by event, plus one trailing row carrying the created-events count.
+    # Archived tickets always sit next to their archived event, so each side joins locally.
     cursor.execute('''
-        SELECT t.id, t.ticket_number, t.purchase_date, e.name, e.date, e.location
+        SELECT e.id, e.name, e.date, e.location, COUNT(*), MAX(t.purchase_date) AS last_purchase
         FROM tickets t
         JOIN events e ON t.event_id = e.id
         WHERE t.user_id = ?
-        ORDER BY t.purchase_date DESC
-    ''', (session['user_id'],))
-    tickets = cursor.fetchall()
-    
-    # Get event counts
-    cursor.execute('SELECT COUNT(*) FROM tickets WHERE user_id = ?', (session['user_id'],))
-    registered_events = cursor.fetchone()[0]
+        GROUP BY e.id
+        UNION ALL
+        SELECT e.id, e.name, e.date, e.location, COUNT(*), MAX(t.purchase_date)
+        FROM tickets_archive t
+        JOIN events_archive e ON t.event_id = e.id
+        WHERE t.user_id = ?
+        GROUP BY e.id
+        UNION ALL
+        SELECT NULL, NULL, NULL, NULL, COUNT(*), NULL
+        FROM all_events
+        WHERE creator_id = ?
+        ORDER BY last_purchase DESC
+    ''', (user_id, user_id, user_id))
+    rows = cursor.fetchall()
+    conn.close()
     
-    cursor.execute('SELECT COUNT(*) FROM events WHERE creator_id = ?', (session['user_id'],))
-    created_events = cursor.fetchone()[0]
+    events = [row[:5] for row in rows if row[0] is not None]
+    summary = {
+        'registered': sum(event[4] for event in events),
+        'created': next(row[4] for row in rows if row[0] is None),
+        'events': events
+    }
+    entry['summary'] = summary
+    return summary
+
+def get_profile_tickets(user_id, page):
+    entry = _cached_profile_entry(user_id)
+    tickets = entry['pages'].get(page)
+    if tickets is not None:
+        return tickets
     
+    conn = sqlite3.connect(DATABASE)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT t.id, t.ticket_seq, t.purchase_date, e.name, e.date, e.location, t.legacy_number
+        FROM all_tickets t
+        JOIN all_events e ON t.event_id = e.id
+        WHERE t.user_id = ?
+        ORDER BY t.purchase_date DESC, t.id DESC
+        LIMIT ? OFFSET ?
+    ''', (user_id, PROFILE_PAGE_SIZE, (page - 1) * PROFILE_PAGE_SIZE))
+    tickets = cursor.fetchall()
     conn.close()
     
+    _cache_profile_page(entry, page, tickets)
+    return tickets
+
+@app.route('/profile')
+def profile():
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    
+    summary = get_profile_summary(session['user_id'])
+    total_pages = max(1, -(-summary['registered'] // PROFILE_PAGE_SIZE))
+    page = min(max(request.args.get('page', 1, type=int), 1), total_pages)
+    tickets = get_profile_tickets(session['user_id'], page)
+    
     user_events = {
-        'registered': registered_events,
-        'created': created_events
+        'registered': summary['registered'],
+        'created': summary['created']
     }
     
     return render_template('profile.html', 
                          user_events=user_events, 
-                         tickets=tickets)
+                         event_tickets=summary['events'],
+                         tickets=tickets,
+                         page=page,
+                         total_pages=total_pages)
+
+@app.route('/verify_ticket/<ticket_number>')
+def verify_ticket(ticket_number):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'})
+    
+    # Codes with a bad check pair are rejected without touching the database;
+    # numbers issued before sequence allocation are looked up as stored
+    ticket_seq = decode_ticket_number(ticket_number)
+    if ticket_seq is None and not ticket_number.startswith('TICKET-'):
+        return jsonify({'valid': False})
+    
+    conn = sqlite3.connect(DATABASE)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT e.name, e.date, e.location
+        FROM all_tickets t
+        JOIN all_events e ON t.event_id = e.id
+        WHERE {'t.ticket_seq' if ticket_seq is not None else 't.legacy_number'} = ?
+          AND (t.user_id = ? OR e.creator_id = ?)
+    ''', (ticket_seq if ticket_seq is not None else ticket_number,
+          session['user_id'], session['user_id']))
+    ticket = cursor.fetchone()
+    conn.close()
+    
+    if not ticket:
+        return jsonify({'valid': False})
+    return jsonify({'valid': True, 'event': ticket[0], 'date': ticket[1], 'location': ticket[2]})
 
 @app.route('/download_ticket/<int:ticket_id>')
 def download_ticket(ticket_id):
@@ -231,14 +1154,14 @@ def download_ticket(ticket_id):
         return redirect(url_for('login'))
     
     try:
-        conn = sqlite3.connect('event_management.db')
+        conn = sqlite3.connect(DATABASE)
         cursor = conn.cursor()
         
         # Get ticket and event details
         cursor.execute('''
-            SELECT t.ticket_number, t.purchase_date, e.name, e.date, e.location, e.ticket_price
-            FROM tickets t
-            JOIN events e ON t.event_id = e.id
+            SELECT t.ticket_seq, t.purchase_date, e.name, e.date, e.location, e.ticket_price, t.legacy_number
+            FROM all_tickets t
+            JOIN all_events e ON t.event_id = e.id
             WHERE t.id = ? AND t.user_id = ?
         ''', (ticket_id, session['user_id']))
         
@@ -249,6 +1172,8 @@ def download_ticket(ticket_id):
             flash('Ticket not found')
             return redirect(url_for('profile'))
 
+        ticket_number = ticket[6] or encode_ticket_number(ticket[0])
+
         # Create PDF
         buffer = BytesIO()
         p = canvas.Canvas(buffer, pagesize=letter)
@@ -265,7 +1190,7 @@ def download_ticket(ticket_id):
             ("Event Name", ticket[2]),
             ("Event Date", ticket[3]),
             ("Location", ticket[4]),
-            ("Ticket Number", ticket[0]),
+            ("Ticket Number", ticket_number),
             ("Purchase Date", ticket[1]),
             ("Price", f"₹{ticket[5]}")
         ]
@@ -282,7 +1207,7 @@ def download_ticket(ticket_id):
             box_size=10,
             border=4,
         )
-        qr.add_data(f"Ticket: {ticket[0]}\nEvent: {ticket[2]}")
+        qr.add_data(f"Ticket: {ticket_number}\nEvent: {ticket[2]}")
         qr.make(fit=True)
 
         qr_img = qr.make_image(fill_color="black", back_color="white")
@@ -310,7 +1235,7 @@ def download_ticket(ticket_id):
         return send_file(
             buffer,
             as_attachment=True,
-            download_name=f'Ticket_{ticket[0]}.pdf',
+            download_name=f'Ticket_{ticket_number}.pdf',
             mimetype='application/pdf'
         )
         
@@ -335,7 +1260,7 @@ def create_event():
     if not all([name, event_type, date, location, capacity, ticket_price]):
         return jsonify({'error': 'All fields are required'})
     
-    conn = sqlite3.connect('event_management.db')
+    conn = sqlite3.connect(DATABASE)
     cursor = conn.cursor()
     
     try:
@@ -345,6 +1270,7 @@ def create_event():
         ''', (name, event_type, date, location, capacity, ticket_price, session['user_id']))
         
         conn.commit()
+        invalidate_profile_cache(session['user_id'])
         return jsonify({'success': True, 'message': 'Event created successfully!'})
     except sqlite3.Error as e:
         return jsonify({'error': f'Database error: {str(e)}'})
@@ -448,25 +1374,18 @@ def reset_chat():
     
     return redirect(url_for('chatbot'))
 
-@app.route('/chatbot_response', methods=['POST'])
-def chatbot_response():
-    if 'user_id' not in session:
-        return redirect(url_for('login'))
-    
-    message = request.form.get('message', '').strip()
-    step = session.get('chat_step', 0)
-    
-    # Store user message in chat history
-    if 'chat_history' not in session:
-        session['chat_history'] = []
-    session['chat_history'].append(('user', message))
+def handle_chat_message(message):
+    """Advance the chat state machine by one message.
 
+    Returns the bot reply, the reply buttons and a URL to redirect to (or None).
+    """
+    step = session.get('chat_step', 0)
     response = ""
     buttons = []
 
     if step == 0:  # Initial choice
         if message.lower() == 'participate':
-            conn = sqlite3.connect('event_management.db')
+            conn = get_read_connection()
             cursor = conn.cursor()
             cursor.execute('SELECT id, name, date, location, ticket_price FROM events')
             events = cursor.fetchall()
@@ -539,36 +1458,66 @@ Would you like to book tickets for this event?"""
             event = session['selected_event']
             num_tickets = session['num_tickets']
             
-            conn = sqlite3.connect('event_management.db')
+            conn = sqlite3.connect(DATABASE, isolation_level=None)
             cursor = conn.cursor()
             
             try:
-                # Check if enough tickets are available
+                # Numbers come from a reserved block; reserving one takes its own write
+                # lock, so it happens before the purchase transaction below begins
+                ticket_seqs = ticket_allocator.allocate(num_tickets)
+                
+                # The check and the insert share one write transaction, so the event
+                # cannot be archived or sold out in between
+                cursor.execute('BEGIN IMMEDIATE')
                 cursor.execute('SELECT capacity FROM events WHERE id = ?', (event[0],))
-                capacity = cursor.fetchone()[0]
+                event_row = cursor.fetchone()
                 
-                cursor.execute('SELECT COUNT(*) FROM tickets WHERE event_id = ?', (event[0],))
-                sold_tickets = cursor.fetchone()[0]
+                if event_row is not None:
+                    cursor.execute('SELECT COUNT(*) FROM tickets WHERE event_id = ?', (event[0],))
+                    sold_tickets = cursor.fetchone()[0]
                 
-                if sold_tickets + num_tickets > capacity:
+                if event_row is None:
+                    # Archived since it was selected
+                    cursor.execute('ROLLBACK')
+                    response = "Sorry, this event is no longer available. Would you like to check other events?"
+                    buttons = ['Participate', 'Arrange']
+                    session['chat_step'] = 0
+                elif sold_tickets + num_tickets > event_row[0]:
+                    cursor.execute('ROLLBACK')
                     response = "Sorry, not enough tickets available for this event."
                     buttons = ['Check Other Events', 'Exit']
                     session['chat_step'] = 0
                 else:
-                    # Generate tickets
-                    for _ in range(num_tickets):
-                        ticket_number = f"TICKET-{uuid.uuid4().hex[:8]}"
-                        cursor.execute('''
-                            INSERT INTO tickets (event_id, user_id, ticket_number, purchase_date)
-                            VALUES (?, ?, ?, ?)
-                        ''', (event[0], session['user_id'], ticket_number, 
-                             datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+                    purchase_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    cursor.executemany('''
+                        INSERT INTO tickets (event_id, user_id, ticket_seq, purchase_date)
+                        VALUES (?, ?, ?, ?)
+                    ''', [(event[0], session['user_id'], ticket_seq, purchase_date)
+                          for ticket_seq in ticket_seqs])
+                    
+                    # Confirmation is committed with the tickets and sent by the dispatcher
+                    ticket_numbers = '\n'.join(encode_ticket_number(ticket_seq) for ticket_seq in ticket_seqs)
+                    enqueue_notification(cursor, session['user_id'],
+                                         f"Your tickets for {event[1]}",
+                                         f"""Thank you for your purchase!
+
+Event: {event[1]}
+Date: {event[2]}
+Location: {event[3]}
+Tickets: {num_tickets}
+Total: ₹{session['total_price']}
+
+Ticket numbers:
+{ticket_numbers}""")
                     
-                    conn.commit()
+                    cursor.execute('COMMIT')
+                    invalidate_profile_cache(session['user_id'])
                     response = "Payment successful! Your tickets have been generated."
                     buttons = ['View Tickets in Profile', 'Book Another Event']
                     session['chat_step'] = 5
             except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
                 response = "There was an error processing your payment. Please try again."
                 buttons = ['Try Again', 'Cancel']
             finally:
@@ -580,7 +1529,7 @@ Would you like to book tickets for this event?"""
 
     elif step == 5:  # Post-payment options
         if message == 'View Tickets in Profile':
-            return redirect(url_for('profile'))
+            return response, buttons, url_for('profile')
         elif message == 'Book Another Event':
             response = "Would you like to participate in an event or arrange one?"
             buttons = ['Participate', 'Arrange']
@@ -647,7 +1596,7 @@ Would you like to proceed with these arrangements?"""
             data = session['event_data']
             venue = session['suggested_venue']
             
-            conn = sqlite3.connect('event_management.db')
+            conn = sqlite3.connect(DATABASE)
             cursor = conn.cursor()
             try:
                 cursor.execute('''
@@ -655,7 +1604,19 @@ Would you like to proceed with these arrangements?"""
                     VALUES (?, ?, ?, ?, ?, ?, ?)
                 ''', (data['name'], data['type'], data['date'], venue['name'], 
                      data['capacity'], data['ticket_price'], session['user_id']))
+                enqueue_notification(cursor, session['user_id'],
+                                     f"Your event {data['name']} is confirmed",
+                                     f"""Your event has been created.
+
+Event: {data['name']}
+Type: {data['type']}
+Date: {data['date']}
+Venue: {venue['name']}
+Capacity: {data['capacity']}
+Ticket Price: ₹{data['ticket_price']}
+Total Cost: ₹{venue['total_cost']}""")
                 conn.commit()
+                invalidate_profile_cache(session['user_id'])
                 response = "Great! Your event has been created successfully! You can view it on the home page."
                 buttons = ['Create Another Event', 'Exit']
                 session['chat_step'] = 0
@@ -678,6 +1639,25 @@ Total Cost: ₹{reduced_cost}
 Would you like to proceed with these arrangements?"""
             buttons = ['Accept', 'Exit']
 
+    session.modified = True
+    return response, buttons, None
+
+@app.route('/chatbot_response', methods=['POST'])
+def chatbot_response():
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    
+    message = request.form.get('message', '').strip()
+    
+    # Store user message in chat history
+    if 'chat_history' not in session:
+        session['chat_history'] = []
+    session['chat_history'].append(('user', message))
+
+    response, buttons, redirect_url = handle_chat_message(message)
+    if redirect_url:
+        return redirect(redirect_url)
+
     # Store bot response in chat history
     session['chat_history'].append(('bot', response))
     session.modified = True
@@ -688,6 +1668,24 @@ Would you like to proceed with these arrangements?"""
         buttons=buttons
     )
 
+@app.route('/chatbot_api', methods=['POST'])
+def chatbot_api():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'})
+    
+    # The transcript lives in the page, so only the new turn is sent back and
+    # the session stays the same size however long the conversation runs
+    data = request.get_json(silent=True) or {}
+    message = str(data.get('message', '')).strip()
+    response, buttons, redirect_url = handle_chat_message(message)
+    
+    return jsonify({
+        'reply': response,
+        'buttons': buttons,
+        'step': session.get('chat_step', 0),
+        'redirect': redirect_url
+    })
+
 def validate_date(date_str):
     try:
         date = datetime.strptime(date_str, '%Y-%m-%d')
@@ -730,7 +1728,12 @@ def get_alternate_venue(event_type):
 
 # Initialize the database when the app starts
 if __name__ == '__main__':
-    # Create the database file if it doesn't exist
-    if not os.path.exists('event_management.db'):
-        init_db()
-    app.run(debug=True)
\ No newline at end of file
+    # Create the database, or bring an existing one up to the current schema
+    init_db()
+    # Decide the run mode before app.run() so the dispatcher starts in exactly one
+    # process: the server itself, or the reloader's child but never its watcher
+    load_dotenv()
+    debug = get_debug_flag() if 'FLASK_DEBUG' in os.environ else True
+    if not debug or is_running_from_reloader():
+        outbox_dispatcher.start()
+    app.run(debug=debug)
\ No newline at end of file
@@ -0,0 +1,353 @@
+import gzip
+import os
+import re
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+import app1
+from app1 import app, init_db
+
+
+def timed(func, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def seed_tickets(db_path, user_id, count):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        'INSERT INTO tickets (event_id, user_id, ticket_seq, purchase_date) VALUES (?, ?, ?, ?)',
+        [((i % 6) + 1, user_id, ticket_seq, f'2024-11-{(i % 28) + 1:02d} 10:00:00')
+         for i, ticket_seq in enumerate(app1.ticket_allocator.allocate(count))])
+    conn.commit()
+    conn.close()
+
+
+def legacy_profile_queries(db_path, user_id):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT t.id, t.ticket_seq, t.purchase_date, e.name, e.date, e.location
+        FROM tickets t
+        JOIN events e ON t.event_id = e.id
+        WHERE t.user_id = ?
+        ORDER BY t.purchase_date DESC
+    ''', (user_id,))
+    tickets = cursor.fetchall()
+    cursor.execute('SELECT COUNT(*) FROM tickets WHERE user_id = ?', (user_id,))
+    registered = cursor.fetchone()[0]
+    cursor.execute('SELECT COUNT(*) FROM events WHERE creator_id = ?', (user_id,))
+    created = cursor.fetchone()[0]
+    conn.close()
+    return tickets, registered, created
+
+
+def bench_profile(ticket_count=10000):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+        sess['username'] = 'admin'
+
+    seed_tickets(app1.DATABASE, 1, ticket_count)
+
+    legacy_ms, _ = timed(lambda: legacy_profile_queries(app1.DATABASE, 1))
+
+    def uncached():
+        app1.invalidate_profile_cache(1)
+        return app1.get_profile_summary(1), app1.get_profile_tickets(1, 1)
+    uncached_ms, _ = timed(uncached)
+    cached_ms, _ = timed(lambda: (app1.get_profile_summary(1), app1.get_profile_tickets(1, 1)))
+
+    app1.invalidate_profile_cache(1)
+    cold_ms, response = timed(lambda: client.get('/profile'), repeat=1)
+    warm_ms, response = timed(lambda: client.get('/profile'))
+
+    print(f"profile with {ticket_count} tickets")
+    print(f"  legacy queries (3, unbounded): {legacy_ms:8.2f} ms")
+    print(f"  consolidated queries:          {uncached_ms:8.2f} ms")
+    print(f"  cached:                        {cached_ms:8.3f} ms")
+    print(f"  GET /profile cold:             {cold_ms:8.2f} ms")
+    print(f"  GET /profile warm:             {warm_ms:8.2f} ms ({len(response.data)} bytes)")
+
+
+CHAT_SCRIPT = ['Participate', 'Tech Summit 2024', 'Yes', '2', 'Proceed to Payment',
+               'Book Another Event', 'Arrange', 'Bench Expo', '2030-01-15', 'exhibition',
+               '400', '250', 'Negotiate', 'Accept']
+
+
+def chatbot_conversation_bytes(accept_encoding):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+        sess['username'] = 'admin'
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+
+    page = client.get('/chatbot', headers=headers)
+    html_bytes = len(page.data)
+    for message in CHAT_SCRIPT:
+        response = client.post('/chatbot_response', data={'message': message}, headers=headers)
+        html_bytes += len(response.data)
+
+    # The stylesheet is fetched once per conversation; fingerprinted URLs make repeat visits free
+    css_url = re.search(r'href="(/static/chatbot\.css[^"]*)"', page.get_data(as_text=True)
+                        if not accept_encoding else gzip.decompress(page.data).decode()).group(1)
+    css = client.get(css_url, headers=headers)
+    css_bytes = len(css.data)
+    css.close()
+    return html_bytes, css_bytes
+
+
+def bench_chatbot_bytes():
+    plain_html, plain_css = chatbot_conversation_bytes(None)
+    gzip_html, gzip_css = chatbot_conversation_bytes('gzip')
+    plain_total = plain_html + plain_css
+    gzip_total = gzip_html + gzip_css
+    print(f"chatbot conversation of {len(CHAT_SCRIPT)} turns")
+    print(f"  identity: {plain_total:7d} bytes (html {plain_html}, css {plain_css})")
+    print(f"  gzip:     {gzip_total:7d} bytes (html {gzip_html}, css {gzip_css})")
+    print(f"  reduction: {100 * (1 - gzip_total / plain_total):.1f}%")
+
+
+def chat_turn_cost(client, path, turns):
+    # Each turn costs the response body plus the session cookie sent back
+    samples = {}
+    for turn in range(1, turns + 1):
+        start = time.perf_counter()
+        if path == '/chatbot_api':
+            response = client.post(path, json={'message': 'hello'})
+        else:
+            response = client.post(path, data={'message': 'hello'})
+        elapsed = (time.perf_counter() - start) * 1000
+        if turn in (1, turns):
+            samples[turn] = (len(response.data) + len(response.headers.get('Set-Cookie', '')), elapsed)
+    return samples
+
+
+def bench_chatbot_turns(turns=200):
+    print(f"chatbot turn cost, turn 1 vs turn {turns}")
+    for label, path in (('full page', '/chatbot_response'), ('json api', '/chatbot_api')):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = 1
+            sess['username'] = 'admin'
+        client.get('/chatbot')
+        samples = chat_turn_cost(client, path, turns)
+        first_bytes, first_ms = samples[1]
+        last_bytes, last_ms = samples[turns]
+        print(f"  {label:9s}: turn 1 {first_bytes:7d} bytes {first_ms:6.2f} ms | "
+              f"turn {turns} {last_bytes:7d} bytes {last_ms:6.2f} ms")
+
+
+def seed_multi_year(db_path, years=(2023, 2024, 2025, 2026), events_per_year=500, tickets_per_event=100):
+    # Reserve ticket numbers before opening the write transaction, as the purchase path does
+    ticket_seqs = iter(app1.ticket_allocator.allocate(len(years) * events_per_year * tickets_per_event))
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    for year in years:
+        for i in range(events_per_year):
+            cursor.execute('''
+                INSERT INTO events (name, type, date, location, capacity, ticket_price, creator_id)
+                VALUES (?, 'conference', ?, 'Chennai Trade Centre', 1000, 500, 1)
+            ''', (f'Event {year}-{i}', f'{year}-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}'))
+            event_id = cursor.lastrowid
+            cursor.executemany(
+                'INSERT INTO tickets (event_id, user_id, ticket_seq, purchase_date) VALUES (?, ?, ?, ?)',
+                [(event_id, (n % 50) + 1, next(ticket_seqs), f'{year}-01-01 10:00:00')
+                 for n in range(tickets_per_event)])
+    conn.commit()
+    conn.close()
+
+
+def hot_path_timings(db_path, event_id):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    home_ms, _ = timed(lambda: cursor.execute('SELECT * FROM events ORDER BY date ASC').fetchall(), repeat=5)
+    participate_ms, _ = timed(lambda: cursor.execute(
+        'SELECT id, name, date, location, ticket_price FROM events').fetchall(), repeat=5)
+    sold_ms, _ = timed(lambda: cursor.execute(
+        'SELECT COUNT(*) FROM tickets WHERE event_id = ?', (event_id,)).fetchone(), repeat=5)
+    conn.close()
+
+    def profile():
+        app1.invalidate_profile_cache(1)
+        return app1.get_profile_summary(1), app1.get_profile_tickets(1, 1)
+    profile_ms, _ = timed(profile, repeat=5)
+    return home_ms, participate_ms, sold_ms, profile_ms
+
+
+def bench_archive():
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    original_db = app1.DATABASE
+    app1.DATABASE = db_path
+    app1.ticket_allocator.reset()
+    try:
+        init_db()
+        seed_multi_year(db_path)
+        conn = sqlite3.connect(db_path)
+        current_event = conn.execute("SELECT MAX(id) FROM events").fetchone()[0]
+        conn.close()
+
+        before = hot_path_timings(db_path, current_event)
+        start = time.perf_counter()
+        archived_events, archived_tickets = app1.archive_past_events('2026-01-01')
+        archive_ms = (time.perf_counter() - start) * 1000
+        after = hot_path_timings(db_path, current_event)
+
+        print(f"archive of {archived_events} events / {archived_tickets} tickets: {archive_ms:.0f} ms")
+        for label, old, new in zip(('home listing', 'participate list', 'sold COUNT', 'profile (uncached)'),
+                                   before, after):
+            print(f"  {label:18s}: {old:8.2f} ms -> {new:8.2f} ms")
+    finally:
+        app1.DATABASE = original_db
+        app1.ticket_allocator.reset()
+        os.remove(db_path)
+
+
+def read_latencies_under_writes(db_path, connect, reads=50, hold=0.05):
+    # A writer repeatedly holds an exclusive lock, as a large purchase does at commit
+    stop = threading.Event()
+
+    def writer():
+        conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+        while not stop.is_set():
+            conn.execute('BEGIN EXCLUSIVE')
+            conn.execute("UPDATE events SET capacity = capacity WHERE id = 1")
+            time.sleep(hold)
+            conn.execute('COMMIT')
+            time.sleep(0.005)
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    latencies = []
+    locked = 0
+    try:
+        for _ in range(reads):
+            start = time.perf_counter()
+            conn = connect()
+            try:
+                conn.execute('SELECT * FROM events ORDER BY date ASC').fetchall()
+            except sqlite3.OperationalError:
+                locked += 1
+            finally:
+                conn.close()
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.005)
+    finally:
+        stop.set()
+        thread.join()
+    return statistics.median(latencies), max(latencies), locked
+
+
+def bench_read_split():
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    replica_path = db_path + '.replica'
+    original_db = app1.DATABASE
+    app1.DATABASE = db_path
+    try:
+        init_db()
+        print("listing read latency during a write burst (median / max)")
+
+        conn = sqlite3.connect(db_path)
+        conn.execute('PRAGMA journal_mode=DELETE')
+        conn.close()
+        median, worst, locked = read_latencies_under_writes(db_path, lambda: sqlite3.connect(db_path, timeout=1))
+        print(f"  primary, rollback journal: {median:7.2f} / {worst:7.2f} ms, {locked} locked")
+
+        conn = sqlite3.connect(db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.close()
+        median, worst, locked = read_latencies_under_writes(db_path, app1.get_read_connection)
+        print(f"  WAL snapshot:              {median:7.2f} / {worst:7.2f} ms, {locked} locked")
+
+        app1.READ_REPLICA = replica_path
+        median, worst, locked = read_latencies_under_writes(db_path, app1.get_read_connection)
+        print(f"  backup replica ({app1.READ_REPLICA_MAX_STALENESS}s):     {median:7.2f} / {worst:7.2f} ms, {locked} locked")
+    finally:
+        app1.read_replica.stop()
+        app1.READ_REPLICA = None
+        app1.DATABASE = original_db
+        for path in (db_path, db_path + '-wal', db_path + '-shm', replica_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def checkout_latencies(client, purchases):
+    latencies = []
+    for _ in range(purchases):
+        for message in ['Participate', 'Science Expo', 'Yes', '1']:
+            client.post('/chatbot_api', json={'message': message})
+        start = time.perf_counter()
+        client.post('/chatbot_api', json={'message': 'Proceed to Payment'})
+        latencies.append((time.perf_counter() - start) * 1000)
+        client.post('/chatbot_api', json={'message': 'Book Another Event'})
+    return statistics.median(latencies)
+
+
+def bench_outbox(messages=10000, purchases=100):
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    log_path = db_path + '.log'
+    original_db = app1.DATABASE
+    app1.DATABASE = db_path
+    app1.ticket_allocator.reset()
+    try:
+        init_db()
+        conn = sqlite3.connect(db_path)
+        conn.execute('UPDATE events SET capacity = 1000000')
+        cursor = conn.cursor()
+        for i in range(messages):
+            app1.enqueue_notification(cursor, 1, f'Subject {i}', 'Body ' * 40)
+        conn.commit()
+        conn.close()
+
+        dispatcher = app1.OutboxDispatcher(app1.FileSink(log_path))
+        start = time.perf_counter()
+        dispatcher.drain()
+        elapsed = time.perf_counter() - start
+        print(f"outbox dispatch of {messages} notifications to a file sink")
+        print(f"  {dispatcher.metrics['batches']} batches, {elapsed * 1000:.0f} ms total, "
+              f"{messages / elapsed:.0f} msgs/s end to end, {dispatcher.throughput():.0f} msgs/s in sink")
+
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = 1
+            sess['username'] = 'admin'
+        client.get('/chatbot')
+        idle_ms = checkout_latencies(client, purchases)
+        dispatcher.start()
+        try:
+            busy_ms = checkout_latencies(client, purchases)
+        finally:
+            dispatcher.stop()
+        print(f"  checkout (median, incl. outbox insert): dispatcher idle {idle_ms:.2f} ms, "
+              f"dispatcher running {busy_ms:.2f} ms")
+    finally:
+        app1.DATABASE = original_db
+        app1.ticket_allocator.reset()
+        for path in (db_path, db_path + '-wal', db_path + '-shm', log_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == '__main__':
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    app1.DATABASE = db_path
+    try:
+        init_db()
+        bench_profile()
+        bench_chatbot_bytes()
+        bench_chatbot_turns()
+    finally:
+        os.remove(db_path)
+    bench_archive()
+    bench_read_split()
+    bench_outbox()
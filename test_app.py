@@ -1,4 +1,14 @@
+import gzip
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
 import unittest
+import app1
 from app1 import app, init_db
 
 
@@ -61,7 +71,712 @@ class TestApp(unittest.TestCase):
             self.assertIn(b'Event created successfully!', response.data)
 
 
+class TempDatabaseTestCase(unittest.TestCase):
+    def create_database_file(self):
+        fd, db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        return db_path
+
+    def setUp(self):
+        self.db_path = self.create_database_file()
+        self.original_db = app1.DATABASE
+        app1.DATABASE = self.db_path
+        init_db()
+        app1.ticket_allocator.reset()
+        app1.profile_cache.clear()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        app1.DATABASE = self.original_db
+        app1.ticket_allocator.reset()
+        app1.profile_cache.clear()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    def login(self, user_id=1, username='admin'):
+        with self.client.session_transaction() as sess:
+            sess['user_id'] = user_id
+            sess['username'] = username
+
+    def add_tickets(self, event_id, count, user_id=1):
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany(
+            'INSERT INTO tickets (event_id, user_id, ticket_seq, purchase_date) VALUES (?, ?, ?, ?)',
+            [(event_id, user_id, ticket_seq, '2024-11-01 10:00:00')
+             for ticket_seq in app1.ticket_allocator.allocate(count)])
+        conn.commit()
+        conn.close()
+
+
+class TestTicketNumbers(TempDatabaseTestCase):
+
+    def test_allocate_is_contiguous_within_block(self):
+        numbers = app1.ticket_allocator.allocate(5)
+        self.assertEqual(numbers, list(range(numbers[0], numbers[0] + 5)))
+        self.assertEqual(app1.ticket_allocator.allocate(1), [numbers[-1] + 1])
+
+    def test_allocate_larger_than_block(self):
+        numbers = app1.ticket_allocator.allocate(app1.TICKET_BLOCK_SIZE * 3 + 7)
+        self.assertEqual(len(set(numbers)), app1.TICKET_BLOCK_SIZE * 3 + 7)
+
+    def test_separate_allocators_never_overlap(self):
+        other = app1.TicketAllocator()
+        first = app1.ticket_allocator.allocate(10)
+        second = other.allocate(10)
+        self.assertFalse(set(first) & set(second))
+
+    def test_ticket_number_round_trip(self):
+        for ticket_seq in (1, 31, 32, 123456, 2 ** 40):
+            ticket_number = app1.encode_ticket_number(ticket_seq)
+            self.assertEqual(app1.decode_ticket_number(ticket_number), ticket_seq)
+
+    def test_ticket_number_rejects_bad_check(self):
+        ticket_number = app1.encode_ticket_number(42)
+        body, check = ticket_number.rsplit('-', 1)
+        bad_check = '00' if check != '00' else '11'
+        self.assertIsNone(app1.decode_ticket_number(f"{body}-{bad_check}"))
+        self.assertIsNone(app1.decode_ticket_number('TICKET-1234abcd'))
+        self.assertIsNone(app1.decode_ticket_number(f"{body}-\u00e9\u00e9"))
+
+    def test_check_does_not_depend_on_session_key(self):
+        ticket_number = app1.encode_ticket_number(42)
+        original_key = app.secret_key
+        app.secret_key = 'rotated-session-key'
+        try:
+            self.assertEqual(app1.decode_ticket_number(ticket_number), 42)
+        finally:
+            app.secret_key = original_key
+
+    def test_verify_ticket(self):
+        self.add_tickets(1, 1)
+        conn = sqlite3.connect(self.db_path)
+        ticket_seq = conn.execute('SELECT ticket_seq FROM tickets').fetchone()[0]
+        conn.execute("INSERT INTO users (username, password, email) VALUES ('other', 'x', 'other@example.com')")
+        conn.commit()
+        conn.close()
+        ticket_number = app1.encode_ticket_number(ticket_seq)
+        self.login()
+        data = self.client.get(f'/verify_ticket/{ticket_number}').get_json()
+        self.assertEqual(data, {'valid': True, 'event': 'Tech Summit 2024',
+                                'date': '2024-12-15', 'location': 'Chennai Trade Centre'})
+        body, check = ticket_number.rsplit('-', 1)
+        bad_check = '00' if check != '00' else '11'
+        self.assertFalse(self.client.get(f'/verify_ticket/{body}-{bad_check}').get_json()['valid'])
+        self.assertFalse(self.client.get(f'/verify_ticket/{body}-%C3%A9%C3%A9').get_json()['valid'])
+        self.login(user_id=2, username='other')
+        self.assertFalse(self.client.get(f'/verify_ticket/{ticket_number}').get_json()['valid'])
+
+
+class TestProfile(TempDatabaseTestCase):
+    def ticket_numbers(self, response):
+        return re.findall(rb'TKT-[0-9A-Z]+-[0-9A-Z]{2}', response.data)
+
+    def test_profile_paginates_tickets(self):
+        self.add_tickets(1, 30)
+        self.add_tickets(2, 15)
+        self.login()
+        first = self.client.get('/profile')
+        self.assertEqual(len(self.ticket_numbers(first)), app1.PROFILE_PAGE_SIZE)
+        self.assertIn(b'Page 1 of 3', first.data)
+        last = self.client.get('/profile?page=3')
+        self.assertEqual(len(self.ticket_numbers(last)), 5)
+        self.assertIn(b'Page 3 of 3', last.data)
+
+    def test_profile_summary_groups_by_event(self):
+        self.add_tickets(1, 3)
+        self.add_tickets(2, 2)
+        summary = app1.get_profile_summary(1)
+        self.assertEqual(summary['registered'], 5)
+        self.assertEqual(summary['created'], 6)
+        self.assertEqual(sorted(event[4] for event in summary['events']), [2, 3])
+
+    def test_profile_cache_invalidated_on_purchase(self):
+        self.login()
+        self.assertEqual(app1.get_profile_summary(1)['registered'], 0)
+        for message in ['Participate', 'Tech Summit 2024', 'Yes', '2', 'Proceed to Payment']:
+            self.client.post('/chatbot_response', data={'message': message})
+        self.assertEqual(app1.get_profile_summary(1)['registered'], 2)
+
+    def test_profile_cache_sees_writes_from_other_workers(self):
+        self.add_tickets(1, 2)
+        self.assertEqual(app1.get_profile_summary(1)['registered'], 2)
+        self.assertEqual(len(app1.get_profile_tickets(1, 1)), 2)
+        # Written by another process, so this process's cache was never invalidated
+        self.add_tickets(2, 1)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''INSERT INTO events (name, type, date, location, capacity, ticket_price, creator_id)
+                        VALUES ('Elsewhere', 'conference', '2099-01-01', 'Chennai Trade Centre', 10, 100, 1)''')
+        conn.commit()
+        conn.close()
+        summary = app1.get_profile_summary(1)
+        self.assertEqual((summary['registered'], summary['created']), (3, 7))
+        self.assertEqual(len(app1.get_profile_tickets(1, 1)), 3)
+
+    def test_profile_cache_evicts_expired_entries_and_old_pages(self):
+        self.add_tickets(1, app1.PROFILE_PAGE_SIZE * (app1.PROFILE_CACHE_MAX_PAGES + 2))
+        for page in range(1, app1.PROFILE_CACHE_MAX_PAGES + 3):
+            app1.get_profile_tickets(1, page)
+        self.assertEqual(len(app1.profile_cache[1]['pages']), app1.PROFILE_CACHE_MAX_PAGES)
+        self.assertNotIn(1, app1.profile_cache[1]['pages'])
+        app1.profile_cache[1]['loaded_at'] -= app1.PROFILE_CACHE_TTL + 1
+        app1.get_profile_summary(2)
+        self.assertEqual(list(app1.profile_cache), [2])
+
+
+class TestCachingAndCompression(TempDatabaseTestCase):
+    def stylesheet_url(self):
+        response = self.client.get('/login')
+        return re.search(rb'href="(/static/style\.css\?v=[0-9a-f]+)"', response.data).group(1).decode()
+
+    def test_static_url_is_fingerprinted_and_cached(self):
+        response = self.client.get(self.stylesheet_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cache_control.max_age, app1.STATIC_MAX_AGE)
+        self.assertTrue(response.cache_control.immutable)
+        self.assertFalse(response.cache_control.no_cache)
+        response.close()
+
+    def test_stale_fingerprint_is_not_cached_long(self):
+        response = self.client.get('/static/style.css?v=000000000000')
+        self.assertNotEqual(response.cache_control.max_age, app1.STATIC_MAX_AGE)
+        response.close()
+
+    def test_path_traversal_is_not_hashed(self):
+        app1.static_hashes.clear()
+        for url in ('/static/../../../etc/hostname?v=1', '/static/../app1.py?v=1',
+                    '/static/%2e%2e/app1.py?v=1'):
+            response = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.status_code, 404)
+            response.close()
+        static_root = os.path.abspath(app.static_folder) + os.sep
+        self.assertTrue(all(path.startswith(static_root) for path in app1.static_hashes))
+        self.assertIsNone(app1.static_file_hash('../app1.py'))
+        self.assertIsNone(app1.static_file_hash('/etc/hostname'))
+
+    def test_static_gzip(self):
+        with open(os.path.join(app.static_folder, 'style.css'), 'rb') as f:
+            original = f.read()
+        response = self.client.get(self.stylesheet_url(), headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.data), original)
+
+    def test_uncompressed_static_varies_on_encoding(self):
+        response = self.client.get(self.stylesheet_url())
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        response.close()
+
+    def test_compressed_static_revalidates(self):
+        url = self.stylesheet_url()
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        etag = response.headers['ETag']
+        revalidated = self.client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.data, b'')
+        self.assertEqual(revalidated.headers['ETag'], etag)
+        self.assertIn('Accept-Encoding', revalidated.headers['Vary'])
+
+    def test_html_gzip_above_threshold(self):
+        self.login()
+        plain = self.client.get('/chatbot')
+        compressed = self.client.get('/chatbot', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', compressed.headers['Vary'])
+        self.assertEqual(gzip.decompress(compressed.data), plain.data)
+
+    def test_small_responses_not_compressed(self):
+        response = self.client.post('/create_event', json={}, headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+
+
+class TestChatbotApi(TempDatabaseTestCase):
+    def send(self, message):
+        return self.client.post('/chatbot_api', json={'message': message}).get_json()
+
+    def test_requires_login(self):
+        self.assertEqual(self.send('Participate'), {'error': 'Not logged in'})
+
+    def test_returns_only_new_turn(self):
+        self.login()
+        self.client.get('/chatbot')
+        data = self.send('Participate')
+        self.assertEqual(data['reply'], 'Here are the available events:')
+        self.assertEqual(data['step'], 1)
+        self.assertIn('Tech Summit 2024 - ₹1500.0', data['buttons'])
+        self.assertIsNone(data['redirect'])
+
+    def test_purchase_flow_and_redirect(self):
+        self.login()
+        self.client.get('/chatbot')
+        for message in ['Participate', 'Tech Summit 2024', 'Yes', '2']:
+            self.send(message)
+        data = self.send('Proceed to Payment')
+        self.assertEqual(data['reply'], 'Payment successful! Your tickets have been generated.')
+        self.assertEqual(app1.get_profile_summary(1)['registered'], 2)
+        data = self.send('View Tickets in Profile')
+        self.assertEqual(data['redirect'], '/profile')
+
+    def test_response_size_constant_across_turns(self):
+        self.login()
+        self.client.get('/chatbot')
+        first = self.client.post('/chatbot_api', json={'message': 'hello'})
+        for _ in range(50):
+            last = self.client.post('/chatbot_api', json={'message': 'hello'})
+        self.assertEqual(len(last.data), len(first.data))
+        self.assertEqual(len(last.headers.get('Set-Cookie', '')), len(first.headers.get('Set-Cookie', '')))
+
+
+class TestArchive(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            INSERT INTO events (name, type, date, location, capacity, ticket_price, creator_id)
+            VALUES ('Future Expo', 'exhibition', '2099-01-01', 'Chennai Trade Centre', 100, 300, 1)
+        ''')
+        self.future_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+        conn.commit()
+        conn.close()
+        self.add_tickets(1, 4)
+        self.add_tickets(self.future_id, 2)
+
+    def count(self, table):
+        conn = sqlite3.connect(self.db_path)
+        result = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        conn.close()
+        return result
+
+    def test_moves_past_events_and_tickets(self):
+        archived = app1.archive_past_events('2026-01-01', batch_size=2)
+        self.assertEqual(archived, (6, 4))
+        self.assertEqual(self.count('events'), 1)
+        self.assertEqual(self.count('tickets'), 2)
+        self.assertEqual(self.count('events_archive'), 6)
+        self.assertEqual(self.count('tickets_archive'), 4)
+        self.assertEqual(app1.archive_past_events('2026-01-01'), (0, 0))
+
+    def test_home_reads_hot_set_only(self):
+        app1.archive_past_events('2026-01-01')
+        self.login()
+        response = self.client.get('/home')
+        self.assertIn(b'Future Expo', response.data)
+        self.assertNotIn(b'Tech Summit 2024', response.data)
+
+    def test_profile_includes_archive(self):
+        before = app1.get_profile_summary(1)
+        app1.archive_past_events('2026-01-01')
+        app1.profile_cache.clear()
+        after = app1.get_profile_summary(1)
+        self.assertEqual(after, before)
+        self.assertEqual(len(app1.get_profile_tickets(1, 1)), 6)
+
+    def test_purchase_of_event_archived_mid_chat(self):
+        self.login()
+        self.client.get('/chatbot')
+        for message in ['Participate', 'Tech Summit 2024', 'Yes', '2']:
+            self.client.post('/chatbot_api', json={'message': message})
+        app1.archive_past_events('2026-01-01')
+        response = self.client.post('/chatbot_api', json={'message': 'Proceed to Payment'})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['reply'], 'Sorry, this event is no longer available. '
+                                        'Would you like to check other events?')
+        self.assertEqual(data['step'], 0)
+        self.assertEqual(self.count('tickets_archive'), 4)
+
+    def test_archiving_during_purchase_leaves_no_orphans(self):
+        class ArchivingAllocator(app1.TicketAllocator):
+            def allocate(self, count):
+                # Runs between the chat's event lookup and its ticket insert
+                numbers = super().allocate(count)
+                app1.archive_past_events('2026-01-01')
+                return numbers
+
+        self.login()
+        self.client.get('/chatbot')
+        for message in ['Participate', 'Tech Summit 2024', 'Yes', '2']:
+            self.client.post('/chatbot_api', json={'message': message})
+        original_allocator = app1.ticket_allocator
+        app1.ticket_allocator = ArchivingAllocator()
+        try:
+            data = self.client.post('/chatbot_api', json={'message': 'Proceed to Payment'}).get_json()
+        finally:
+            app1.ticket_allocator = original_allocator
+        self.assertEqual(data['reply'], 'Sorry, this event is no longer available. '
+                                        'Would you like to check other events?')
+        conn = sqlite3.connect(self.db_path)
+        orphans = conn.execute('''
+            SELECT COUNT(*) FROM tickets WHERE event_id NOT IN (SELECT id FROM events)
+        ''').fetchone()[0]
+        conn.close()
+        self.assertEqual(orphans, 0)
+        self.assertEqual(self.count('tickets_archive'), 4)
+
+    def test_init_db_does_not_reseed_after_archiving(self):
+        app1.archive_past_events('2026-01-01')
+        init_db()
+        self.assertEqual(self.count('events'), 1)
+
+
+class TestReadSplit(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.original_replica = app1.READ_REPLICA
+        self.original_staleness = app1.READ_REPLICA_MAX_STALENESS
+        self.replica_path = self.db_path + '.replica'
+
+    def tearDown(self):
+        app1.READ_REPLICA = self.original_replica
+        app1.READ_REPLICA_MAX_STALENESS = self.original_staleness
+        app1.read_replica.stop()
+        app1.read_replica = app1.ReadReplica()
+        if os.path.exists(self.replica_path):
+            os.remove(self.replica_path)
+        super().tearDown()
+
+    def add_event(self, name):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            INSERT INTO events (name, type, date, location, capacity, ticket_price, creator_id)
+            VALUES (?, 'conference', '2099-01-01', 'ITC Grand Chola', 100, 100, 1)
+        ''', (name,))
+        conn.commit()
+        conn.close()
+
+    def event_names(self):
+        conn = app1.get_read_connection()
+        names = [row[0] for row in conn.execute('SELECT name FROM events')]
+        conn.close()
+        return names
+
+    def test_replica_is_not_refreshed_by_readers(self):
+        app1.READ_REPLICA = self.replica_path
+        app1.READ_REPLICA_MAX_STALENESS = 60
+        self.assertIn('Tech Summit 2024', self.event_names())
+        self.add_event('Late Addition')
+        self.assertNotIn('Late Addition', self.event_names())
+        app1.read_replica.refresh(self.replica_path)
+        self.assertIn('Late Addition', self.event_names())
+
+    def test_replica_refreshes_in_background(self):
+        app1.READ_REPLICA = self.replica_path
+        app1.READ_REPLICA_MAX_STALENESS = 0.05
+        self.event_names()
+        self.add_event('Late Addition')
+        deadline = time.time() + 5
+        while 'Late Addition' not in self.event_names() and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertIn('Late Addition', self.event_names())
+
+    def test_failed_refresh_removes_temporary_file(self):
+        directory = os.path.dirname(self.replica_path)
+        corrupt_path = self.db_path + '.corrupt'
+        with open(corrupt_path, 'w') as f:
+            f.write('not a database' * 100)
+        before = set(os.listdir(directory))
+        app1.DATABASE = corrupt_path
+        try:
+            with self.assertRaises(sqlite3.DatabaseError):
+                app1.read_replica.refresh(self.replica_path)
+        finally:
+            app1.DATABASE = self.db_path
+            os.remove(corrupt_path)
+        self.assertEqual(set(os.listdir(directory)) - before, set())
+
+    def test_profile_reads_primary_with_replica(self):
+        app1.READ_REPLICA = self.replica_path
+        app1.READ_REPLICA_MAX_STALENESS = 60
+        self.login()
+        self.client.get('/home')
+        self.client.get('/chatbot')
+        self.assertEqual(app1.get_profile_summary(1)['registered'], 0)
+        for message in ['Participate', 'Tech Summit 2024', 'Yes', '2', 'Proceed to Payment']:
+            self.client.post('/chatbot_api', json={'message': message})
+        response = self.client.get('/profile')
+        self.assertIn(b'<div class="stat-value">2</div>', response.data)
+
+    def test_read_connection_is_read_only(self):
+        conn = app1.get_read_connection()
+        with self.assertRaises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM events")
+        conn.close()
+
+    def read_latencies_during_write_burst(self):
+        stop = threading.Event()
+
+        def writer():
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            while not stop.is_set():
+                conn.execute('BEGIN EXCLUSIVE')
+                conn.execute('''
+                    INSERT INTO events (name, type, date, location, capacity, ticket_price, creator_id)
+                    VALUES ('Burst', 'conference', '2099-01-01', 'ITC Grand Chola', 100, 100, 1)
+                ''')
+                time.sleep(0.2)
+                conn.execute('COMMIT')
+            conn.close()
+
+        self.login()
+        self.client.get('/home')
+        thread = threading.Thread(target=writer)
+        thread.start()
+        latencies = []
+        try:
+            for _ in range(20):
+                start = time.perf_counter()
+                response = self.client.get('/home')
+                latencies.append(time.perf_counter() - start)
+                self.assertEqual(response.status_code, 200)
+                time.sleep(0.02)
+        finally:
+            stop.set()
+            thread.join()
+        return latencies
+
+    def test_wal_reads_do_not_wait_for_writers(self):
+        self.assertLess(max(self.read_latencies_during_write_burst()), 0.1)
+
+    def test_replica_reads_do_not_wait_for_writers(self):
+        app1.READ_REPLICA = self.replica_path
+        app1.READ_REPLICA_MAX_STALENESS = 0.05
+        self.assertLess(max(self.read_latencies_during_write_burst()), 0.1)
+
+
+class FlakySink:
+    def __init__(self, fail_ids=()):
+        self.fail_ids = set(fail_ids)
+        self.batches = []
+
+    def send_batch(self, messages):
+        self.batches.append(messages)
+        return {message['id']: 'mailbox unavailable'
+                for message in messages if message['id'] in self.fail_ids}
+
+
+class TestOutbox(TempDatabaseTestCase):
+    def outbox_rows(self):
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute('SELECT id, recipient, subject, body, status, attempts FROM outbox ORDER BY id').fetchall()
+        conn.close()
+        return rows
+
+    def enqueue(self, count):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        for i in range(count):
+            app1.enqueue_notification(cursor, 1, f'Subject {i}', 'Body')
+        conn.commit()
+        conn.close()
+
+    def test_purchase_queues_confirmation(self):
+        self.login()
+        self.client.get('/chatbot')
+        for message in ['Participate', 'Tech Summit 2024', 'Yes', '2', 'Proceed to Payment']:
+            self.client.post('/chatbot_api', json={'message': message})
+        rows = self.outbox_rows()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][1], 'admin@example.com')
+        self.assertEqual(rows[0][2], 'Your tickets for Tech Summit 2024')
+        self.assertEqual(rows[0][3].count('TKT-'), 2)
+        self.assertEqual(rows[0][4], 'pending')
+
+    def test_failed_purchase_queues_nothing(self):
+        self.login()
+        self.client.get('/chatbot')
+        for message in ['Participate', 'Tech Summit 2024', 'Yes', '501', 'Proceed to Payment']:
+            data = self.client.post('/chatbot_api', json={'message': message}).get_json()
+        self.assertEqual(data['reply'], 'Sorry, not enough tickets available for this event.')
+        self.assertEqual(self.outbox_rows(), [])
+
+    def test_event_creation_queues_confirmation(self):
+        self.login()
+        self.client.get('/chatbot')
+        for message in ['Arrange', 'Outbox Expo', '2099-05-01', 'exhibition', '200', '300', 'Accept']:
+            self.client.post('/chatbot_api', json={'message': message})
+        rows = self.outbox_rows()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][2], 'Your event Outbox Expo is confirmed')
+
+    def test_dispatch_in_batches_to_file_sink(self):
+        self.enqueue(5)
+        path = self.db_path + '.log'
+        dispatcher = app1.OutboxDispatcher(app1.FileSink(path), batch_size=2)
+        try:
+            while dispatcher.dispatch_batch():
+                pass
+            with open(path, encoding='utf-8') as f:
+                messages = [json.loads(line) for line in f]
+        finally:
+            os.remove(path)
+        self.assertEqual([message['subject'] for message in messages], [f'Subject {i}' for i in range(5)])
+        self.assertEqual(dispatcher.metrics['sent'], 5)
+        self.assertEqual(dispatcher.metrics['batches'], 3)
+        self.assertTrue(all(row[4] == 'sent' for row in self.outbox_rows()))
+
+    def test_failures_retry_with_backoff(self):
+        self.enqueue(3)
+        sink = FlakySink(fail_ids={2})
+        dispatcher = app1.OutboxDispatcher(sink)
+        self.assertEqual(dispatcher.dispatch_batch(), 2)
+        self.assertEqual(dispatcher.metrics['retried'], 1)
+        # The failed message is not due again until its backoff expires
+        self.assertEqual(dispatcher.dispatch_batch(), 0)
+        self.assertEqual(len(sink.batches), 1)
+        row = self.outbox_rows()[1]
+        self.assertEqual((row[4], row[5]), ('pending', 1))
+
+    def test_gives_up_after_max_attempts(self):
+        self.enqueue(1)
+        dispatcher = app1.OutboxDispatcher(FlakySink(fail_ids={1}))
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('UPDATE outbox SET attempts = ?', (app1.OUTBOX_MAX_ATTEMPTS - 1,))
+        conn.commit()
+        conn.close()
+        dispatcher.dispatch_batch()
+        self.assertEqual(self.outbox_rows()[0][4], 'failed')
+        self.assertEqual(dispatcher.metrics['failed'], 1)
+
+    def test_drain_continues_past_failed_batch(self):
+        self.enqueue(3)
+        dispatcher = app1.OutboxDispatcher(FlakySink(fail_ids={1}), batch_size=1)
+        self.assertEqual(dispatcher.drain(), 2)
+        self.assertEqual([row[4] for row in self.outbox_rows()], ['pending', 'sent', 'sent'])
+        self.assertEqual(dispatcher.metrics['retried'], 1)
+
+    def test_purge_removes_only_old_sent_rows(self):
+        self.enqueue(3)
+        dispatcher = app1.OutboxDispatcher(FlakySink(fail_ids={3}))
+        dispatcher.drain()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('UPDATE outbox SET next_attempt_at = next_attempt_at - ? WHERE id IN (1, 3)',
+                     (app1.OUTBOX_RETENTION + app1.OUTBOX_LEASE + 1,))
+        conn.commit()
+        conn.close()
+        self.assertEqual(dispatcher.purge(batch_size=1), 1)
+        self.assertEqual([(row[0], row[4]) for row in self.outbox_rows()], [(2, 'sent'), (3, 'pending')])
+        self.assertEqual(dispatcher.metrics['purged'], 1)
+
+    def test_expired_lease_leaves_rows_to_new_owner(self):
+        self.enqueue(2)
+        db_path = self.db_path
+
+        class SlowSink(FlakySink):
+            def send_batch(self, messages):
+                # Another dispatcher re-claims the rows while this send is in flight
+                conn = sqlite3.connect(db_path)
+                conn.execute('UPDATE outbox SET next_attempt_at = next_attempt_at + 1')
+                conn.commit()
+                conn.close()
+                return super().send_batch(messages)
+
+        dispatcher = app1.OutboxDispatcher(SlowSink(fail_ids={2}))
+        self.assertEqual(dispatcher.dispatch_batch(), 0)
+        self.assertEqual(dispatcher.metrics['lease_lost'], 2)
+        self.assertEqual(dispatcher.metrics['retried'], 0)
+        self.assertEqual([(row[4], row[5]) for row in self.outbox_rows()], [('pending', 0), ('pending', 0)])
+
+    def test_background_thread_delivers(self):
+        sink = FlakySink()
+        dispatcher = app1.OutboxDispatcher(sink)
+        self.enqueue(3)
+        dispatcher.start()
+        try:
+            deadline = time.time() + 5
+            while dispatcher.metrics['sent'] < 3 and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            dispatcher.stop()
+        self.assertEqual(dispatcher.metrics['sent'], 3)
+
+
+class TestMigration(TempDatabaseTestCase):
+    def create_database_file(self):
+        db_path = super().create_database_file()
+        # Schema and data as written by the original app
+        conn = sqlite3.connect(db_path)
+        conn.executescript('''
+            CREATE TABLE users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL,
+                email TEXT UNIQUE NOT NULL
+            );
+            CREATE TABLE events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                type TEXT NOT NULL,
+                date TEXT NOT NULL,
+                location TEXT NOT NULL,
+                capacity INTEGER NOT NULL,
+                ticket_price REAL NOT NULL,
+                creator_id INTEGER,
+                FOREIGN KEY (creator_id) REFERENCES users (id)
+            );
+            CREATE TABLE tickets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_id INTEGER,
+                user_id INTEGER,
+                ticket_number TEXT UNIQUE NOT NULL,
+                purchase_date TEXT NOT NULL,
+                FOREIGN KEY (event_id) REFERENCES events (id),
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            );
+            INSERT INTO users (username, password, email) VALUES ('admin', 'x', 'admin@example.com');
+            INSERT INTO events (name, type, date, location, capacity, ticket_price, creator_id)
+            VALUES ('Tech Summit 2024', 'conference', '2024-12-15', 'Chennai Trade Centre', 500, 1500, 1);
+            INSERT INTO tickets (event_id, user_id, ticket_number, purchase_date)
+            VALUES (1, 1, 'TICKET-0a1b2c3d', '2024-11-01 10:00:00'),
+                   (1, 1, 'TICKET-4e5f6a7b', '2024-11-02 10:00:00');
+        ''')
+        conn.close()
+        return db_path
+
+    def test_legacy_tickets_are_backfilled(self):
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute('SELECT ticket_seq, legacy_number FROM tickets ORDER BY id').fetchall()
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        conn.close()
+        self.assertEqual(rows, [(1, 'TICKET-0a1b2c3d'), (2, 'TICKET-4e5f6a7b')])
+        self.assertEqual(version, app1.SCHEMA_VERSION)
+
+    def test_new_allocations_start_above_backfill(self):
+        self.assertGreater(min(app1.ticket_allocator.allocate(5)), 2)
+
+    def test_profile_and_purchase_work_after_migration(self):
+        self.login()
+        response = self.client.get('/profile')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'TICKET-0a1b2c3d', response.data)
+        self.assertTrue(self.client.get('/verify_ticket/TICKET-0a1b2c3d').get_json()['valid'])
+        self.client.get('/chatbot')
+        for message in ['Participate', 'Tech Summit 2024', 'Yes', '1']:
+            self.client.post('/chatbot_api', json={'message': message})
+        data = self.client.post('/chatbot_api', json={'message': 'Proceed to Payment'}).get_json()
+        self.assertEqual(data['reply'], 'Payment successful! Your tickets have been generated.')
+        self.assertEqual(app1.get_profile_summary(1)['registered'], 3)
+
+    def test_archived_legacy_tickets_use_index(self):
+        app1.archive_past_events(before='2025-01-01')
+        conn = sqlite3.connect(self.db_path)
+        plan = conn.execute('''
+            EXPLAIN QUERY PLAN SELECT id FROM all_tickets WHERE legacy_number = ?
+        ''', ('TICKET-0a1b2c3d',)).fetchall()
+        conn.close()
+        self.assertIn('idx_tickets_archive_legacy', ' '.join(row[-1] for row in plan))
+        self.login()
+        self.assertTrue(self.client.get('/verify_ticket/TICKET-0a1b2c3d').get_json()['valid'])
+
+    def test_init_db_is_idempotent(self):
+        init_db()
+        init_db()
+        conn = sqlite3.connect(self.db_path)
+        count = conn.execute('SELECT COUNT(*) FROM tickets').fetchone()[0]
+        conn.close()
+        self.assertEqual(count, 2)
+
+
 if __name__ == '__main__':
     unittest.TextTestRunner(resultclass=CustomTestResult).run(
-        unittest.defaultTestLoader.loadTestsFromTestCase(TestApp)
+        unittest.defaultTestLoader.loadTestsFromModule(sys.modules[__name__])
     )